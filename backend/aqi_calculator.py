@@ -5,64 +5,71 @@ This module calculates the Air Quality Index (AQI) based on pollutant concentrat
 Uses the EPA AQI breakpoint table for calculation.
 """
 
-from typing import Dict, Tuple
-import random
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Mapping, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # AQI Breakpoints for different pollutants (EPA standard)
-# Format: [(C_low, C_high, I_low, I_high), ...]
+# Format: ((C_low, C_high, I_low, I_high), ...)
 
-PM25_BREAKPOINTS = [
+PM25_BREAKPOINTS = (
     (0.0, 12.0, 0, 50),
     (12.1, 35.4, 51, 100),
     (35.5, 55.4, 101, 150),
     (55.5, 150.4, 151, 200),
     (150.5, 250.4, 201, 300),
     (250.5, 500.4, 301, 500),
-]
+)
 
-PM10_BREAKPOINTS = [
+PM10_BREAKPOINTS = (
     (0, 54, 0, 50),
     (55, 154, 51, 100),
     (155, 254, 101, 150),
     (255, 354, 151, 200),
     (355, 424, 201, 300),
     (425, 604, 301, 500),
-]
+)
 
-CO_BREAKPOINTS = [  # ppm
+CO_BREAKPOINTS = (  # ppm
     (0.0, 4.4, 0, 50),
     (4.5, 9.4, 51, 100),
     (9.5, 12.4, 101, 150),
     (12.5, 15.4, 151, 200),
     (15.5, 30.4, 201, 300),
     (30.5, 50.4, 301, 500),
-]
+)
 
-NO2_BREAKPOINTS = [  # ppb
+NO2_BREAKPOINTS = (  # ppb
     (0, 53, 0, 50),
     (54, 100, 51, 100),
     (101, 360, 101, 150),
     (361, 649, 151, 200),
     (650, 1249, 201, 300),
     (1250, 2049, 301, 500),
-]
+)
 
-SO2_BREAKPOINTS = [  # ppb
+SO2_BREAKPOINTS = (  # ppb
     (0, 35, 0, 50),
     (36, 75, 51, 100),
     (76, 185, 101, 150),
     (186, 304, 151, 200),
     (305, 604, 201, 300),
     (605, 1004, 301, 500),
-]
+)
 
-O3_BREAKPOINTS = [  # ppm
+O3_BREAKPOINTS = (  # ppm
     (0.000, 0.054, 0, 50),
     (0.055, 0.070, 51, 100),
     (0.071, 0.085, 101, 150),
     (0.086, 0.105, 151, 200),
     (0.106, 0.200, 201, 300),
-]
+)
 
 POLLUTANT_BREAKPOINTS = {
     'pm25': PM25_BREAKPOINTS,
@@ -73,6 +80,90 @@ POLLUTANT_BREAKPOINTS = {
     'o3': O3_BREAKPOINTS,
 }
 
+# Resolution of each breakpoint table: multiplying a concentration by its scale
+# gives the integer bucket used to index the lookup tables below (EPA truncates
+# PM2.5 and CO to 0.1, O3 to 0.001 ppm and the remaining pollutants to integers).
+POLLUTANT_SCALES = {
+    'pm25': 10,
+    'pm10': 1,
+    'co': 10,
+    'no2': 1,
+    'so2': 1,
+    'o3': 1000,
+}
+
+# Guards against float products such as 0.071 * 1000 == 70.99999999999999
+_BUCKET_EPSILON = 1e-9
+
+def _build_lut(breakpoints: Tuple[Tuple[float, float, int, int], ...], scale: int) -> Tuple[array, array, array, int, float]:
+    """
+    Expand a breakpoint table into per-bucket lookup arrays.
+
+    Every bucket stores the slope, C_low and I_low of the breakpoint range it
+    falls in, so a concentration can be converted with a single index instead
+    of scanning the table.
+
+    Returns:
+        Tuple of (slopes, c_lows, i_lows, scale, c_max)
+    """
+    c_max = breakpoints[-1][1]
+    max_idx = int(c_max * scale + _BUCKET_EPSILON)
+    starts = [int(c_low * scale + _BUCKET_EPSILON) for c_low, _, _, _ in breakpoints]
+
+    slopes, c_lows, i_lows = array('d'), array('d'), array('d')
+    segment = 0
+    for idx in range(max_idx + 1):
+        while segment + 1 < len(starts) and starts[segment + 1] <= idx:
+            segment += 1
+        c_low, c_high, i_low, i_high = breakpoints[segment]
+        slopes.append((i_high - i_low) / (c_high - c_low))
+        c_lows.append(c_low)
+        i_lows.append(i_low)
+
+    return slopes, c_lows, i_lows, scale, c_max
+
+# Precomputed lookup tables, keyed by pollutant
+EPA_LUT = {
+    pollutant: _build_lut(breakpoints, POLLUTANT_SCALES[pollutant])
+    for pollutant, breakpoints in POLLUTANT_BREAKPOINTS.items()
+}
+
+def _build_interp_table(breakpoints: Tuple[Tuple[float, float, int, int], ...]) -> Tuple[Tuple[float, ...], Tuple[int, ...]]:
+    """Flatten a breakpoint table into monotonic (C, I) knots for np.interp."""
+    c_points, i_points = [], []
+    for c_low, c_high, i_low, i_high in breakpoints:
+        c_points += (c_low, c_high)
+        i_points += (i_low, i_high)
+    return tuple(c_points), tuple(i_points)
+
+# Interpolation knots used by calculate_aqi_batch, keyed by pollutant
+EPA_INTERP_TABLES = {
+    pollutant: _build_interp_table(breakpoints)
+    for pollutant, breakpoints in POLLUTANT_BREAKPOINTS.items()
+}
+
+# Upper AQI bound of each category; anything above the last one is Hazardous.
+# EPA_CATEGORIES and EPA_MESSAGES are indexed by bisect_left on these bounds.
+EPA_THRESHOLDS = (50, 100, 150, 200, 300)
+
+EPA_CATEGORIES = (
+    ("Good", "#00e400"),
+    ("Moderate", "#ffff00"),
+    ("Unhealthy for Sensitive Groups", "#ff7e00"),
+    ("Unhealthy", "#ff0000"),
+    ("Very Unhealthy", "#8f3f97"),
+    ("Hazardous", "#7e0023"),
+)
+
+EPA_MESSAGES = (
+    "Air quality is satisfactory, and air pollution poses little or no risk.",
+    "Air quality is acceptable. However, there may be a risk for some people, particularly those who are unusually sensitive to air pollution.",
+    "Members of sensitive groups may experience health effects. The general public is less likely to be affected.",
+    "Some members of the general public may experience health effects; members of sensitive groups may experience more serious health effects.",
+    "Health alert: The risk of health effects is increased for everyone.",
+    "Health warning of emergency conditions: everyone is more likely to be affected.",
+)
+
 POLLUTANT_NAMES = {
     'pm25': 'PM2.5',
     'pm10': 'PM10',
@@ -82,15 +173,30 @@ POLLUTANT_NAMES = {
     'o3': 'O3',
 }
 
-def calculate_aqi_for_pollutant(concentration: float, breakpoints: list) -> int:
+@lru_cache(maxsize=4096)
+def _aqi_core(bucket: int, pollutant: str) -> int:
+    """Apply the EPA formula to a truncated concentration bucket."""
+    slopes, c_lows, i_lows, scale, _ = EPA_LUT[pollutant]
+    # EPA AQI formula
+    aqi = slopes[bucket] * (bucket / scale - c_lows[bucket]) + i_lows[bucket]
+    return round(aqi)
+
+def calculate_aqi_for_pollutant(concentration: float, pollutant: str) -> int:
     """
     Calculate AQI for a single pollutant using the EPA formula.
     
     AQI = [(I_high - I_low) / (C_high - C_low)] * (C - C_low) + I_low
     
+    The concentration is truncated to the table's resolution (see
+    POLLUTANT_SCALES), as the EPA specifies, and the result for each bucket
+    is cached, so repeated readings cost a single dict hit.
+    
+    Negative readings (including -inf) map to 0; NaN and readings above the
+    table (including +inf) map to 500.
+    
     Args:
         concentration: Pollutant concentration
-        breakpoints: List of breakpoint tuples (C_low, C_high, I_low, I_high)
+        pollutant: Pollutant key, e.g. 'pm25'
     
     Returns:
         AQI value for the pollutant
@@ -98,14 +204,43 @@ def calculate_aqi_for_pollutant(concentration: float, breakpoints: list) -> int:
     if concentration < 0:
         return 0
     
-    for c_low, c_high, i_low, i_high in breakpoints:
-        if c_low <= concentration <= c_high:
-            # EPA AQI formula
-            aqi = ((i_high - i_low) / (c_high - c_low)) * (concentration - c_low) + i_low
-            return round(aqi)
+    _, _, _, scale, c_max = EPA_LUT[pollutant]
     
-    # If concentration exceeds all breakpoints, return hazardous level
-    return 500
+    # If concentration exceeds all breakpoints (or is NaN, which fails every
+    # comparison), return hazardous level
+    if not concentration <= c_max:
+        return 500
+    
+    return _aqi_core(int(concentration * scale + _BUCKET_EPSILON), pollutant)
+
+def calculate_aqi_batch(concentrations: Sequence[float], pollutant: str) -> "np.ndarray":
+    """
+    Calculate AQI for many readings of a single pollutant at once.
+    
+    Useful for time series or many stations, where calling
+    calculate_aqi_for_pollutant in a Python loop would dominate.
+    
+    Args:
+        concentrations: Array-like of pollutant concentrations
+        pollutant: Pollutant key, e.g. 'pm25'
+    
+    Returns:
+        NumPy int16 array of AQI values
+    """
+    # Imported here so the API server does not pay NumPy's import cost
+    import numpy as np
+    
+    c_points, i_points = EPA_INTERP_TABLES[pollutant]
+    scale = POLLUTANT_SCALES[pollutant]
+    concentrations = np.asarray(concentrations, dtype=np.float64)
+    # Truncate to the table's resolution, as calculate_aqi_for_pollutant does
+    truncated = np.floor(concentrations * scale + _BUCKET_EPSILON) / scale
+    
+    aqi = np.rint(np.interp(truncated, c_points, i_points))
+    # Negative readings map to 0 via the first knot; beyond the table (or NaN,
+    # which fails every comparison) is hazardous, as in the scalar path
+    aqi = np.where(concentrations <= c_points[-1], aqi, 500)
+    return aqi.astype(np.int16)
 
 def get_aqi_category(aqi: int) -> Tuple[str, str]:
     """
@@ -114,35 +249,33 @@ def get_aqi_category(aqi: int) -> Tuple[str, str]:
     Returns:
         Tuple of (category, color)
     """
-    if aqi <= 50:
-        return "Good", "#00e400"
-    elif aqi <= 100:
-        return "Moderate", "#ffff00"
-    elif aqi <= 150:
-        return "Unhealthy for Sensitive Groups", "#ff7e00"
-    elif aqi <= 200:
-        return "Unhealthy", "#ff0000"
-    elif aqi <= 300:
-        return "Very Unhealthy", "#8f3f97"
-    else:
-        return "Hazardous", "#7e0023"
+    return EPA_CATEGORIES[bisect_left(EPA_THRESHOLDS, aqi)]
 
 def get_health_message(aqi: int) -> str:
     """Get health message based on AQI value."""
-    if aqi <= 50:
-        return "Air quality is satisfactory, and air pollution poses little or no risk."
-    elif aqi <= 100:
-        return "Air quality is acceptable. However, there may be a risk for some people, particularly those who are unusually sensitive to air pollution."
-    elif aqi <= 150:
-        return "Members of sensitive groups may experience health effects. The general public is less likely to be affected."
-    elif aqi <= 200:
-        return "Some members of the general public may experience health effects; members of sensitive groups may experience more serious health effects."
-    elif aqi <= 300:
-        return "Health alert: The risk of health effects is increased for everyone."
-    else:
-        return "Health warning of emergency conditions: everyone is more likely to be affected."
-
-def calculate_aqi(pollutants: Dict[str, float]) -> Dict:
+    return EPA_MESSAGES[bisect_left(EPA_THRESHOLDS, aqi)]
+
+@dataclass(slots=True, frozen=True)
+class AQIResult:
+    """Overall AQI for a set of pollutant readings."""
+    aqi: int
+    category: str
+    color: str
+    dominant_pollutant: str
+    message: str
+    # Stored as a read-only view; left out of the hash since mappings are unhashable
+    individual_aqis: Mapping[str, int] = field(hash=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'individual_aqis', MappingProxyType(dict(self.individual_aqis)))
+    
+    def as_dict(self) -> Dict:
+        """Return the result as a plain dictionary, e.g. for JSON output."""
+        result = {f.name: getattr(self, f.name) for f in fields(self)}
+        result['individual_aqis'] = dict(self.individual_aqis)
+        return result
+
+def calculate_aqi(pollutants: Dict[str, float]) -> AQIResult:
     """
     Calculate overall AQI from multiple pollutants.
     
@@ -151,41 +284,46 @@ def calculate_aqi(pollutants: Dict[str, float]) -> Dict:
                    e.g., {'pm25': 35.5, 'pm10': 150, 'o3': 0.068}
     
     Returns:
-        Dictionary containing AQI value, category, dominant pollutant, etc.
+        AQIResult with the AQI value, category, dominant pollutant, etc.
     """
     aqi_values = {}
     
     # Calculate AQI for each pollutant
     for pollutant, concentration in pollutants.items():
-        if concentration is not None and pollutant in POLLUTANT_BREAKPOINTS:
-            breakpoints = POLLUTANT_BREAKPOINTS[pollutant]
-            aqi_value = calculate_aqi_for_pollutant(concentration, breakpoints)
+        if concentration is not None and pollutant in EPA_LUT:
+            aqi_value = calculate_aqi_for_pollutant(concentration, pollutant)
             aqi_values[pollutant] = aqi_value
     
     # If no valid pollutants, generate sample data for demo
     if not aqi_values:
         # Generate random sample data for demonstration
+        import random
         sample_pm25 = random.uniform(0, 100)
-        aqi_values['pm25'] = calculate_aqi_for_pollutant(sample_pm25, PM25_BREAKPOINTS)
+        aqi_values['pm25'] = calculate_aqi_for_pollutant(sample_pm25, 'pm25')
     
     # Overall AQI is the maximum of individual AQIs
-    max_aqi = max(aqi_values.values())
-    dominant_pollutant = max(aqi_values, key=aqi_values.get)
+    max_aqi, dominant_pollutant = -1, None
+    for pollutant, aqi_value in aqi_values.items():
+        if aqi_value > max_aqi:
+            max_aqi, dominant_pollutant = aqi_value, pollutant
     
     category, color = get_aqi_category(max_aqi)
     message = get_health_message(max_aqi)
     
-    return {
-        'aqi': max_aqi,
-        'category': category,
-        'color': color,
-        'dominant_pollutant': POLLUTANT_NAMES[dominant_pollutant],
-        'message': message,
-        'individual_aqis': {POLLUTANT_NAMES[k]: v for k, v in aqi_values.items()}
-    }
+    return AQIResult(
+        aqi=max_aqi,
+        category=category,
+        color=color,
+        dominant_pollutant=POLLUTANT_NAMES[dominant_pollutant],
+        message=message,
+        individual_aqis={POLLUTANT_NAMES[k]: v for k, v in aqi_values.items()},
+    )
 
 def generate_sample_pollutant_data() -> Dict[str, float]:
     """Generate sample pollutant data for demonstration purposes."""
+    # Imported here so callers that never need sample data skip loading it
+    import random
+    
     return {
         'pm25': round(random.uniform(0, 150), 2),
         'pm10': round(random.uniform(0, 250), 2),
@@ -1,13 +1,16 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 import uvicorn
+import math
 import os
-from aqi_calculator import calculate_aqi, generate_sample_pollutant_data
+from aqi_calculator import POLLUTANT_BREAKPOINTS, calculate_aqi, generate_sample_pollutant_data
 
-app = FastAPI(title="AQI Calculator API")
+app = FastAPI(title="AQI Calculator API", default_response_class=ORJSONResponse)
 
 # CORS configuration
 app.add_middleware(
@@ -18,7 +21,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (e.g. /openapi.json); small AQI bodies go out as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 class AQIRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+    
     location: str
     date: str
     # Optional pollutant concentrations (in µg/m³ for PM, ppm for gases)
@@ -29,7 +37,12 @@ class AQIRequest(BaseModel):
     so2: Optional[float] = None
     o3: Optional[float] = None
 
+# AQIRequest fields that carry pollutant concentrations
+POLLUTANT_FIELDS = frozenset(POLLUTANT_BREAKPOINTS)
+
 class AQIResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     aqi: int
     category: str
     color: str
@@ -62,19 +75,12 @@ async def calculate_aqi_endpoint(request: AQIRequest):
             raise HTTPException(status_code=400, detail="Invalid date format. Use ISO format (YYYY-MM-DD)")
         
         # Collect pollutant data
-        pollutants = {}
-        if request.pm25 is not None:
-            pollutants['pm25'] = request.pm25
-        if request.pm10 is not None:
-            pollutants['pm10'] = request.pm10
-        if request.co is not None:
-            pollutants['co'] = request.co
-        if request.no2 is not None:
-            pollutants['no2'] = request.no2
-        if request.so2 is not None:
-            pollutants['so2'] = request.so2
-        if request.o3 is not None:
-            pollutants['o3'] = request.o3
+        pollutants = request.model_dump(include=POLLUTANT_FIELDS, exclude_none=True)
+        
+        # The calculator would report NaN/inf as a Hazardous or Good AQI; the API
+        # treats them as bad input instead
+        if not all(math.isfinite(value) for value in pollutants.values()):
+            raise HTTPException(status_code=400, detail="Pollutant concentrations must be finite numbers")
         
         # If no pollutants provided, generate sample data
         if not pollutants:
@@ -83,14 +89,16 @@ async def calculate_aqi_endpoint(request: AQIRequest):
         # Calculate AQI
         result = calculate_aqi(pollutants)
         
-        return AQIResponse(
-            aqi=result['aqi'],
-            category=result['category'],
-            color=result['color'],
+        # Every field is either already validated on the request or produced
+        # by the calculator, so skip re-validating them
+        return AQIResponse.model_construct(
+            aqi=result.aqi,
+            category=result.category,
+            color=result.color,
             location=request.location,
             date=request.date,
-            dominant_pollutant=result['dominant_pollutant'],
-            message=result['message']
+            dominant_pollutant=result.dominant_pollutant,
+            message=result.message
         )
     
     except HTTPException:
@@ -101,4 +109,6 @@ async def calculate_aqi_endpoint(request: AQIRequest):
 if __name__ == "__main__":
     # Use PORT environment variable for Cloud Run, default to 8000 for local development
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Passed as an import string so uvicorn can honour WEB_CONCURRENCY workers;
+    # uvloop and httptools are picked up automatically when installed
+    uvicorn.run("main:app", host="0.0.0.0", port=port)